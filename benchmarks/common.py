@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import json
+import time
+import platform
+import statistics
+import subprocess
+
+
+def measure(name, func, rounds=5, **info):
+    """
+    Run `func` `rounds` times and return timing statistics(in seconds)
+    along with any extra `info` describing the benchmark.
+    """
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    result = {
+        "name": name,
+        "rounds": rounds,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "max": max(timings),
+    }
+    result.update(info)
+    return result
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(suite, results):
+    return {
+        "suite": suite,
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results
+    }
+
+
+def write_report(report, output=None):
+    content = json.dumps(report, indent=4)
+    if output:
+        with open(output, "w") as f:
+            f.write(content)
+    else:
+        print(content)
+
+
+def compare_reports(old, new):
+    """
+    Return the ratio of the median timing of `new` over `old` for each
+    benchmark found on both reports, a ratio above 1 is a slowdown.
+    """
+    old_results = {result["name"]: result for result in old["results"]}
+    ratios = {}
+    for result in new["results"]:
+        if result["name"] in old_results:
+            old_median = old_results[result["name"]]["median"]
+            ratios[result["name"]] = result["median"] / old_median \
+                if old_median else None
+    return ratios
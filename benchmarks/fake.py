@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Minimal stand-ins for Odoo recordsets and environments, just enough for
+`Serializer` to run without an Odoo server so that micro benchmarks
+measure the serializer itself rather than the ORM.
+"""
+import datetime
+
+
+SCHEMA = {
+    "bench.record": {
+        "id": {"type": "integer"},
+        "name": {"type": "char"},
+        "active": {"type": "boolean"},
+        "date": {"type": "date"},
+        "write_date": {"type": "datetime"},
+        "amount": {"type": "monetary"},
+        "state": {
+            "type": "selection",
+            "selection": [("draft", "Draft"), ("done", "Done")]
+        },
+        "note": {"type": "html"},
+        "image": {"type": "binary"},
+        "partner_id": {"type": "many2one", "relation": "bench.partner"},
+        "tag_ids": {"type": "many2many", "relation": "bench.partner"},
+    },
+    "bench.partner": {
+        "id": {"type": "integer"},
+        "name": {"type": "char"},
+        "email": {"type": "char"},
+    },
+}
+
+
+def generate_data(size, partners=100, tags_per_record=3):
+    partner_rows = {
+        i: {"name": "Partner %s" % i, "email": "partner%s@example.com" % i}
+        for i in range(1, partners + 1)
+    }
+    record_rows = {}
+    for i in range(1, size + 1):
+        record_rows[i] = {
+            "name": "Record %s" % i,
+            "active": bool(i % 2),
+            "date": datetime.date(2020, 1, 1) + datetime.timedelta(days=i),
+            "write_date": datetime.datetime(2020, 1, 1, 12, 30),
+            "amount": i * 1.5,
+            "state": "done" if i % 3 else "draft",
+            "note": "<p>Record %s</p>" % i,
+            "image": b"aW1hZ2U=",
+            "partner_id": i % partners + 1,
+            "tag_ids": [
+                (i + j) % partners + 1 for j in range(tags_per_record)
+            ],
+        }
+    return {"bench.record": record_rows, "bench.partner": partner_rows}
+
+
+class FakeSchema(object):
+    def get_schema(self, model_name):
+        return {"model": model_name, "fields": SCHEMA[model_name]}, '""'
+
+
+class FakeEnv(object):
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, model_name):
+        if model_name == "rest.api.schema":
+            return FakeSchema()
+        return FakeRecordset(self, model_name, [])
+
+
+class FakeRecordset(object):
+    def __init__(self, env, model_name, ids):
+        self.env = env
+        self._name = model_name
+        self.ids = list(ids)
+
+    def browse(self, ids):
+        return FakeRecordset(self.env, self._name, ids)
+
+    def with_context(self, *args, **kwargs):
+        return self
+
+    def fields_get(self, *args, **kwargs):
+        return SCHEMA[self._name]
+
+    @property
+    def id(self):
+        return self.ids[0] if self.ids else False
+
+    @property
+    def display_name(self):
+        return self["name"]
+
+    def __iter__(self):
+        for rec_id in self.ids:
+            yield FakeRecordset(self.env, self._name, [rec_id])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __bool__(self):
+        return bool(self.ids)
+
+    def __getitem__(self, field_name):
+        if field_name == "id":
+            return self.id
+        field = SCHEMA[self._name][field_name]
+        if not self.ids:
+            value = False
+        else:
+            value = self.env.data[self._name][self.id][field_name]
+        if field["type"] == "many2one":
+            return FakeRecordset(
+                self.env,
+                field["relation"],
+                [value] if value else []
+            )
+        if field["type"] in ["one2many", "many2many"]:
+            return FakeRecordset(self.env, field["relation"], value or [])
+        return value
+
+
+def make_recordset(size, **kwargs):
+    env = FakeEnv(generate_data(size, **kwargs))
+    return env["bench.record"].browse(range(1, size + 1))
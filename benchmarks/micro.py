@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Micro benchmarks for `Parser` and `Serializer`, they run without Odoo.
+
+Run them from the module's root directory with
+
+    python -m benchmarks.micro --output results.json
+    python -m benchmarks.micro --compare results.json
+"""
+import os
+import sys
+import json
+import types
+import argparse
+import importlib.util
+
+from .common import measure, build_report, write_report, compare_reports
+from .fake import make_recordset
+
+
+QUERIES = {
+    "flat": "{id, name, amount, state}",
+    "all": "{*}",
+    "exclude": "{-image, -note}",
+    "nested": "{id, name, partner_id{name, email}, tag_ids{name}}",
+    "arguments": "(many2one: pair, selection: label, binary: omit){*}",
+}
+
+
+def load_controllers(names=("exceptions", "parser", "serializers")):
+    """
+    Load Odoo independent modules of `controllers`(`names` in dependency
+    order) without importing `controllers/__init__.py` which depends on
+    Odoo.
+    """
+    path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "controllers"
+    )
+    package = types.ModuleType("rest_api_controllers")
+    package.__path__ = [path]
+    sys.modules[package.__name__] = package
+
+    modules = {}
+    for name in names:
+        full_name = "%s.%s" % (package.__name__, name)
+        spec = importlib.util.spec_from_file_location(
+            full_name,
+            os.path.join(path, name + ".py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[full_name] = module
+        spec.loader.exec_module(module)
+        modules[name] = module
+    return modules
+
+
+def run(sizes, rounds):
+    modules = load_controllers()
+    Parser = modules["parser"].Parser
+    Serializer = modules["serializers"].Serializer
+
+    results = []
+    for query_name, query in QUERIES.items():
+        results.append(measure(
+            "parser.%s" % query_name,
+            lambda: Parser(query).get_parsed(),
+            rounds=rounds,
+            query=query
+        ))
+
+    for size in sizes:
+        records = make_recordset(size)
+        for query_name, query in QUERIES.items():
+            results.append(measure(
+                "serializer.%s.%s" % (query_name, size),
+                lambda: Serializer(records, query, many=True).data,
+                rounds=rounds,
+                query=query,
+                size=size
+            ))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", default="100,1000,10000",
+        help="Comma separated numbers of records to serialize")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", help="File to write the JSON report to")
+    parser.add_argument(
+        "--compare", help="JSON report to compare the results with")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = build_report("micro", run(sizes, args.rounds))
+    write_report(report, args.output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            old_report = json.load(f)
+        ratios = compare_reports(old_report, report)
+        # Keep stdout for the JSON report
+        for name, ratio in sorted(ratios.items()):
+            print("%-40s %s" % (
+                name, "n/a" if ratio is None else "%.2fx" % ratio),
+                file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,31 @@ import math
 import logging
 import requests
 
-from odoo import http, _, exceptions
+from odoo import http, models, exceptions
 from odoo.http import request
 
 from .serializers import Serializer
-from .exceptions import QueryFormatError
+from .payload import Payload, is_ids
+from .exceptions import QueryFormatError, PayloadError
 
 
 _logger = logging.getLogger(__name__)
 
+# Errors raised by `Serializer` on an invalid query, unknown fields
+# raise `LookupError` and flat fields queried as nested raise `ValueError`
+QUERY_ERRORS = (SyntaxError, QueryFormatError, LookupError, ValueError)
+
+
+class PayloadValidationError(exceptions.ValidationError):
+    """
+    Validation error of a write payload, the invalid fields are passed on
+    its context(`data.context` on the response) as `errors`, a list of
+    `{"field": ..., "message": ...}` objects.
+    """
+    def __init__(self, msg, errors):
+        super().__init__(msg)
+        self.context = {"errors": errors}
+
 
 def error_response(error, msg):
     return {
@@ -32,6 +48,160 @@ def error_response(error, msg):
     }
 
 
+def get_model(model, operation="read"):
+    """
+    Return the empty recordset of `model` after making sure it exists and
+    the current user has `operation` access rights on it.
+
+    The lookup is a plain registry lookup, no query is made on the model's
+    table. `check_access_rights` is memoized per user, model and operation
+    by `ir.model.access` itself and that cache is cleared whenever access
+    rules change, so there's no need to cache it once more here.
+    """
+    if model not in request.env.registry:
+        raise KeyError(model)
+    model_obj = request.env[model]
+    model_obj.check_access_rights(operation)
+    return model_obj
+
+
+def get_record(model_obj, rec_id):
+    """
+    Return the record of `model_obj` with `rec_id`, its existence is
+    checked with a single query.
+    """
+    rec = model_obj.browse(rec_id).exists()
+    if not rec:
+        msg = "The record `%s` of `%s` does not exist." % \
+            (rec_id, model_obj._name)
+        raise exceptions.MissingError(msg)
+    return rec
+
+
+# Methods which return records bound to another environment(user,
+# superuser mode, company, etc), they must never be called remotely
+ENV_METHODS = ['sudo', 'with_user', 'with_env', 'with_context', 'with_company']
+
+
+def call_function(obj, function, args=None, kwargs=None, query=None):
+    """
+    Call `function` on `obj`(a model or records) and make its result JSON
+    serializable. Recordsets are serialized with `query` if it's given
+    otherwise their ids are returned.
+    """
+    if not isinstance(function, str):
+        raise exceptions.ValidationError("`function` should be a string.")
+
+    if function.startswith('_') or function in ENV_METHODS:
+        # Same restriction as the one applied on Odoo's own RPC plus
+        # methods which would escape the access rights of the caller
+        msg = "The method `%s` cannot be called remotely." % function
+        raise exceptions.AccessError(msg)
+
+    result = getattr(obj, function)(*(args or []), **(kwargs or {}))
+
+    if isinstance(result, models.BaseModel):
+        if query is None:
+            return result.ids
+        # Read records as the caller whatever environment they come with,
+        # a method may return records in superuser mode
+        result = obj.env[result._name].browse(result.ids)
+        try:
+            return Serializer(result, query, many=True).data
+        except QUERY_ERRORS as e:
+            raise exceptions.ValidationError(str(e))
+    return result
+
+
+def get_payload_values(model_obj, data, with_id=False):
+    """
+    Validate `data` against the fields of `model_obj` and translate it to
+    values which can be passed to `create` or `write`.
+    """
+    schema = request.env['rest.api.schema'].get_schema(model_obj._name)[0]
+    try:
+        return Payload(schema["fields"], data, with_id=with_id).values
+    except PayloadError as e:
+        raise PayloadValidationError(e.msg, e.details)
+
+
+def chunked_search(model, domain, chunk_size):
+    """
+    Yield the records matching `domain` in chunks of at most `chunk_size`
+    records, walking the id column in ascending order(keyset pagination)
+    so that each chunk is a cheap indexed query regardless of how many
+    records were already processed.
+    """
+    last_id = 0
+    while True:
+        recs = model.search(
+            domain + [("id", ">", last_id)],
+            order="id",
+            limit=chunk_size
+        )
+        if not recs:
+            break
+        last_id = recs.ids[-1]
+        yield recs
+
+
+def parse_chunk_params(chunk_size, commit=False):
+    """
+    Validate `chunk_size` and `commit` parameters of bulk operations, they
+    may come as strings(from query strings) or as JSON values.
+    """
+    if not str(chunk_size).isdigit() or int(chunk_size) <= 0:
+        raise ValueError("`chunk_size` should be a positive integer.")
+
+    if isinstance(commit, str) and commit.lower() in ["true", "1"]:
+        commit = True
+    elif isinstance(commit, str) and commit.lower() in ["false", "0"]:
+        commit = False
+    elif not isinstance(commit, bool):
+        raise ValueError("`commit` should be a boolean.")
+    return int(chunk_size), commit
+
+
+def process_in_chunks(model, domain, chunk_size, operation, commit=False):
+    """
+    Apply `operation` to the records matching `domain` chunk by chunk and
+    return the result of the whole operation with per chunk counts.
+
+    Each chunk runs in its own savepoint or, if `commit` is true, is
+    committed immediately so locks are released as we go. The ORM cache
+    is invalidated after every chunk to keep memory usage bounded.
+    Processing stops on the first chunk which fails. Without `commit` the
+    whole transaction is then rolled back so that nothing is applied,
+    with `commit` the chunks committed so far are kept and reported.
+    """
+    chunks = []
+    cr = model.env.cr
+    for recs in chunked_search(model, domain, chunk_size):
+        try:
+            with cr.savepoint():
+                operation(recs)
+        except Exception as e:
+            if not commit:
+                cr.rollback()
+                chunks = []
+            model.invalidate_cache()
+            return {
+                "result": False,
+                "count": sum(chunks),
+                "chunks": chunks,
+                "error": str(e)
+            }
+        chunks.append(len(recs))
+        if commit:
+            cr.commit()
+        model.invalidate_cache()
+    return {
+        "result": True,
+        "count": sum(chunks),
+        "chunks": chunks
+    }
+
+
 class OdooAPI(http.Controller):
     @http.route(
         '/auth/',
@@ -60,34 +230,92 @@ class OdooAPI(http.Controller):
         '/object/<string:model>/<string:function>',
         type='json', auth='user', methods=["POST"], csrf=False)
     def call_model_function(self, model, function, **post):
-        args = []
-        kwargs = {}
-        if "args" in post:
-            args = post["args"]
-        if "kwargs" in post:
-            kwargs = post["kwargs"]
         model = request.env[model]
-        result = getattr(model, function)(*args, **kwargs)
-        return result
+        return call_function(
+            model,
+            function,
+            post.get("args"),
+            post.get("kwargs"),
+            post.get("query")
+        )
 
     @http.route(
         '/object/<string:model>/<int:rec_id>/<string:function>',
         type='json', auth='user', methods=["POST"], csrf=False)
     def call_obj_function(self, model, rec_id, function, **post):
-        args = []
-        kwargs = {}
-        if "args" in post:
-            args = post["args"]
-        if "kwargs" in post:
-            kwargs = post["kwargs"]
         obj = request.env[model].browse(rec_id).ensure_one()
-        result = getattr(obj, function)(*args, **kwargs)
-        return result
+        return call_function(
+            obj,
+            function,
+            post.get("args"),
+            post.get("kwargs"),
+            post.get("query")
+        )
+
+    @http.route(
+        '/object/',
+        type='json', auth='user', methods=["POST"], csrf=False)
+    def call_functions(self, **post):
+        try:
+            calls = post['calls']
+        except KeyError:
+            msg = "`calls` parameter is not found on POST request body"
+            raise exceptions.ValidationError(msg)
+
+        if not isinstance(calls, list):
+            raise exceptions.ValidationError("`calls` should be a list.")
+
+        results = []
+        for index, call in enumerate(calls):
+            if not isinstance(call, dict):
+                msg = "Invalid call %s, it should be an object." % index
+                raise exceptions.ValidationError(msg)
+
+            for key in ["model", "function"]:
+                if not isinstance(call.get(key), str):
+                    msg = "Invalid call %s, `%s` should be a string." % \
+                        (index, key)
+                    raise exceptions.ValidationError(msg)
+
+            try:
+                obj = request.env[call["model"]]
+            except KeyError:
+                msg = "The model `%s` does not exist." % call["model"]
+                raise exceptions.ValidationError(msg)
+            function = call["function"]
+
+            if not isinstance(call.get("context", {}), dict):
+                msg = "Invalid call %s, `context` should be an object." % \
+                    index
+                raise exceptions.ValidationError(msg)
+
+            if not is_ids(call.get("ids", [])):
+                msg = "Invalid call %s, `ids` should be a list of integers." \
+                    % index
+                raise exceptions.ValidationError(msg)
+
+            if "context" in call:
+                obj = obj.with_context(**call["context"])
+            if "ids" in call:
+                # Call the function once on all records
+                obj = obj.browse(call["ids"])
+
+            results.append(call_function(
+                obj,
+                function,
+                call.get("args"),
+                call.get("kwargs"),
+                call.get("query")
+            ))
+        return results
 
     @http.route(
         '/api/<string:model>',
         type='http', auth='user', methods=['GET'], csrf=False)
     def get_model_data(self, model, **params):
+        if "ids" in params:
+            return self.get_model_records(model, **params)
+
         try:
             records = request.env[model].search([])
         except KeyError as e:
@@ -166,12 +394,102 @@ class OdooAPI(http.Controller):
             mimetype='application/json'
         )
 
+    def get_model_records(self, model, **params):
+        try:
+            model_to_get = get_model(model)
+        except KeyError as e:
+            msg = "The model `%s` does not exist." % model
+            res = error_response(e, msg)
+            return http.Response(
+                json.dumps(res),
+                status=200,
+                mimetype='application/json'
+            )
+        except exceptions.AccessError as e:
+            res = error_response(e, str(e))
+            return http.Response(
+                json.dumps(res),
+                status=200,
+                mimetype='application/json'
+            )
+
+        try:
+            ids = [int(rec_id) for rec_id in params["ids"].split(",")]
+        except ValueError as e:
+            msg = "`ids` should be a comma separated list of integers."
+            res = error_response(e, msg)
+            return http.Response(
+                json.dumps(res),
+                status=200,
+                mimetype='application/json'
+            )
+
+        if "query" in params:
+            query = params["query"]
+        else:
+            query = "{*}"
+
+        # Drop duplicates but keep the order in which ids were requested
+        ids = list(dict.fromkeys(ids))
+
+        # `exists` checks all ids in a single query and keeps their order
+        records = model_to_get.browse(ids).exists()
+        found = set(records.ids)
+        missing = [rec_id for rec_id in ids if rec_id not in found]
+
+        try:
+            serializer = Serializer(records, query, many=True)
+            data = serializer.data
+        except QUERY_ERRORS as e:
+            res = error_response(e, str(e))
+            return http.Response(
+                json.dumps(res),
+                status=200,
+                mimetype='application/json'
+            )
+
+        res = {
+            "count": len(records),
+            "missing": missing,
+            "result": data
+        }
+        return http.Response(
+            json.dumps(res),
+            status=200,
+            mimetype='application/json'
+        )
+
+    @http.route(
+        '/api/<string:model>/schema',
+        type='http', auth='user', methods=['GET'], csrf=False)
+    def get_model_schema(self, model, **params):
+        try:
+            schema, etag = request.env['rest.api.schema'].get_schema(model)
+        except KeyError as e:
+            msg = "The model `%s` does not exist." % model
+            res = error_response(e, msg)
+            return http.Response(
+                json.dumps(res),
+                status=200,
+                mimetype='application/json'
+            )
+
+        if request.httprequest.headers.get('If-None-Match') == etag:
+            return http.Response(status=304, headers=[('ETag', etag)])
+
+        return http.Response(
+            json.dumps(schema),
+            status=200,
+            mimetype='application/json',
+            headers=[('ETag', etag)]
+        )
+
     @http.route(
         '/api/<string:model>/<int:rec_id>',
         type='http', auth='user', methods=['GET'], csrf=False)
     def get_model_rec(self, model, rec_id, **params):
         try:
-            records = request.env[model].search([])
+            record = get_record(get_model(model), rec_id)
         except KeyError as e:
             msg = "The model `%s` does not exist." % model
             res = error_response(e, msg)
@@ -180,15 +498,19 @@ class OdooAPI(http.Controller):
                 status=200,
                 mimetype='application/json'
             )
+        except (exceptions.AccessError, exceptions.MissingError) as e:
+            res = error_response(e, str(e))
+            return http.Response(
+                json.dumps(res),
+                status=200,
+                mimetype='application/json'
+            )
 
         if "query" in params:
             query = params["query"]
         else:
             query = "{*}"
 
-        # TODO: Handle the error raised by `ensure_one`
-        record = records.browse(rec_id).ensure_one()
-
         try:
             serializer = Serializer(record, query)
             data = serializer.data
@@ -222,14 +544,17 @@ class OdooAPI(http.Controller):
             msg = "The model `%s` does not exist." % model
             raise exceptions.ValidationError(msg)
 
-        # TODO: Handle data validation
+        values = get_payload_values(model_to_post, data)
 
         if "context" in post:
             context = post["context"]
-            record = model_to_post.with_context(**context).create(data)
+            records = model_to_post.with_context(**context).create(values)
         else:
-            record = model_to_post.create(data)
-        return record.id
+            records = model_to_post.create(values)
+
+        if isinstance(data, list):
+            return records.ids
+        return records.id
 
     # This is for single record update
     @http.route(
@@ -243,55 +568,17 @@ class OdooAPI(http.Controller):
             raise exceptions.ValidationError(msg)
 
         try:
-            model_to_put = request.env[model]
+            model_to_put = get_model(model, "write")
         except KeyError:
             msg = "The model `%s` does not exist." % model
             raise exceptions.ValidationError(msg)
 
-        if "context" in post:
-            # TODO: Handle error raised by `ensure_one`
-            rec = model_to_put.with_context(**post["context"])\
-                .browse(rec_id).ensure_one()
-        else:
-            rec = model_to_put.browse(rec_id).ensure_one()
-
-        # TODO: Handle data validation
-        for field in data:
-            if isinstance(data[field], dict):
-                operations = []
-                for operation in data[field]:
-                    if operation == "push":
-                        operations.extend(
-                            (4, rec_id, _)
-                            for rec_id
-                            in data[field].get("push")
-                        )
-                    elif operation == "pop":
-                        operations.extend(
-                            (3, rec_id, _)
-                            for rec_id
-                            in data[field].get("pop")
-                        )
-                    elif operation == "delete":
-                        operations.extend(
-                            (2, rec_id, _)
-                            for rec_id
-                            in data[field].get("delete")
-                        )
-                    else:
-                        data[field].pop(operation)  # Invalid operation
-
-                data[field] = operations
-            elif isinstance(data[field], list):
-                data[field] = [(6, _, data[field])]  # Replace operation
-            else:
-                pass
+        values = get_payload_values(model_to_put, data)
 
-        try:
-            return rec.write(data)
-        except Exception as e:
-            # TODO: Return error message(e.msg) on a response
-            return False
+        if "context" in post:
+            model_to_put = model_to_put.with_context(**post["context"])
+        rec = get_record(model_to_put, rec_id)
+        return rec.write(values)
 
     # This is for bulk update
     @http.route(
@@ -310,53 +597,54 @@ class OdooAPI(http.Controller):
             msg = "The model `%s` does not exist." % model
             raise exceptions.ValidationError(msg)
 
+        if "context" in post:
+            model_to_put = model_to_put.with_context(**post["context"])
+
+        if isinstance(data, list):
+            if "chunk_size" in post or "commit" in post:
+                msg = "`chunk_size` and `commit` can not be used when " \
+                    "`data` is a list."
+                raise exceptions.ValidationError(msg)
+
+            # Each item holds values of the record with its `id`
+            values = get_payload_values(model_to_put, data, with_id=True)
+            ids = [item.pop("id") for item in values]
+            recs = model_to_put.browse(ids).exists()
+            missing = set(ids) - set(recs.ids)
+            if missing:
+                msg = "The records %s of `%s` do not exist." % \
+                    (sorted(missing), model)
+                raise exceptions.MissingError(msg)
+            for rec_id, rec_values in zip(ids, values):
+                model_to_put.browse(rec_id).write(rec_values)
+            return True
+
+        values = get_payload_values(model_to_put, data)
+
         # TODO: Handle errors on filter
         filters = post["filter"]
 
-        if "context" in post:
-            recs = model_to_put.with_context(**post["context"])\
-                .search(filters)
-        else:
-            recs = model_to_put.search(filters)
-
-        # TODO: Handle data validation
-        for field in data:
-            if isinstance(data[field], dict):
-                operations = []
-                for operation in data[field]:
-                    if operation == "push":
-                        operations.extend(
-                            (4, rec_id, _)
-                            for rec_id
-                            in data[field].get("push")
-                        )
-                    elif operation == "pop":
-                        operations.extend(
-                            (3, rec_id, _)
-                            for rec_id
-                            in data[field].get("pop")
-                        )
-                    elif operation == "delete":
-                        operations.extend(
-                            (2, rec_id, _)
-                            for rec_id in
-                            data[field].get("delete")
-                        )
-                    else:
-                        pass  # Invalid operation
-
-                data[field] = operations
-            elif isinstance(data[field], list):
-                data[field] = [(6, _, data[field])]  # Replace operation
-            else:
-                pass
+        if "chunk_size" in post:
+            try:
+                chunk_size, commit = parse_chunk_params(
+                    post["chunk_size"],
+                    post.get("commit", False)
+                )
+            except ValueError as e:
+                raise exceptions.ValidationError(str(e))
+            return process_in_chunks(
+                model_to_put,
+                filters,
+                chunk_size,
+                # `write` may alter the values it gets, so each chunk
+                # gets its own copy
+                lambda chunk: chunk.write(dict(values)),
+                commit=commit
+            )
 
+        recs = model_to_put.search(filters)
         if recs.exists():
-            try:
-                return recs.write(data)
-            except Exception as e:
-                # TODO: Return error message(e.msg) on a response
-                return False
+            return recs.write(values)
         else:
             # No records to update
             return True
@@ -367,7 +655,7 @@ class OdooAPI(http.Controller):
         type='http', auth="user", methods=['DELETE'], csrf=False)
     def delete_model_record(self, model,  rec_id, **post):
         try:
-            model_to_del_rec = request.env[model]
+            rec = get_record(get_model(model, "unlink"), rec_id)
         except KeyError as e:
             msg = "The model `%s` does not exist." % model
             res = error_response(e, msg)
@@ -376,9 +664,13 @@ class OdooAPI(http.Controller):
                 status=200,
                 mimetype='application/json'
             )
-
-        # TODO: Handle error raised by `ensure_one`
-        rec = model_to_del_rec.browse(rec_id).ensure_one()
+        except (exceptions.AccessError, exceptions.MissingError) as e:
+            res = error_response(e, str(e))
+            return http.Response(
+                json.dumps(res),
+                status=200,
+                mimetype='application/json'
+            )
 
         try:
             is_deleted = rec.unlink()
@@ -416,6 +708,32 @@ class OdooAPI(http.Controller):
                 mimetype='application/json'
             )
 
+        if "chunk_size" in post:
+            try:
+                chunk_size, commit = parse_chunk_params(
+                    post["chunk_size"],
+                    post.get("commit", False)
+                )
+            except ValueError as e:
+                res = error_response(e, str(e))
+                return http.Response(
+                    json.dumps(res),
+                    status=200,
+                    mimetype='application/json'
+                )
+            res = process_in_chunks(
+                model_to_del_rec,
+                filters,
+                chunk_size,
+                lambda chunk: chunk.unlink(),
+                commit=commit
+            )
+            return http.Response(
+                json.dumps(res),
+                status=200,
+                mimetype='application/json'
+            )
+
         # TODO: Handle error raised by `filters`
         recs = model_to_del_rec.search(filters)
 
@@ -442,7 +760,7 @@ class OdooAPI(http.Controller):
         type='http', auth="user", methods=['GET'], csrf=False)
     def get_binary_record(self, model,  rec_id, field, **post):
         try:
-            request.env[model]
+            rec = get_record(get_model(model), rec_id)
         except KeyError as e:
             msg = "The model `%s` does not exist." % model
             res = error_response(e, msg)
@@ -451,12 +769,16 @@ class OdooAPI(http.Controller):
                 status=200,
                 mimetype='application/json'
             )
+        except (exceptions.AccessError, exceptions.MissingError) as e:
+            res = error_response(e, str(e))
+            return http.Response(
+                json.dumps(res),
+                status=200,
+                mimetype='application/json'
+            )
 
-        rec = request.env[model].browse(rec_id).ensure_one()
-        if rec.exists():
-            src = getattr(rec, field).decode("utf-8")
-        else:
-            src = False
+        value = getattr(rec, field)
+        src = value.decode("utf-8") if value else ""
         return http.Response(
             src
         )
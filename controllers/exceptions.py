@@ -1,2 +1,21 @@
 class QueryFormatError(Exception):
-    """Invalid Query Format."""
\ No newline at end of file
+    """Invalid Query Format."""
+
+
+class PayloadError(Exception):
+    """Invalid write payload."""
+
+    def __init__(self, errors):
+        # A list of (field, message) pairs, one for each invalid field
+        self.errors = errors
+        self.msg = "Invalid payload: " + ", ".join(
+            "`%s` %s" % (field, message) for field, message in errors
+        )
+        super().__init__(self.msg)
+
+    @property
+    def details(self):
+        return [
+            {"field": field, "message": message}
+            for field, message in self.errors
+        ]
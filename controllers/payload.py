@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+from .exceptions import PayloadError
+
+
+# Maps an Odoo field type to the function which validates and translates
+# values of that type, see `register_validator`
+validators = {}
+
+# Same formats as the ones used by Odoo's `Date` and `Datetime` fields
+DATE_FORMAT = "%Y-%m-%d"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Operations allowed on one2many and many2many fields and their ORM commands
+X2MANY_OPERATIONS = {
+    "push": 4,  # Link
+    "pop": 3,  # Unlink
+    "delete": 2,  # Unlink and delete
+}
+
+
+def register_validator(*field_types):
+    """
+    Register a validator for one or more Odoo field types.
+
+    A validator is called as `validator(value, field)` where `field` is the
+    field description from the model schema, it must return the value to
+    pass to the ORM or raise `ValueError` with a message explaining why the
+    value is invalid.
+    """
+    def decorator(validator):
+        for field_type in field_types:
+            validators[field_type] = validator
+        return validator
+    return decorator
+
+
+def is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_empty(value):
+    # `null` and `false` both clear a field
+    return value is None or value is False
+
+
+def is_ids(value):
+    return isinstance(value, list) and all(is_integer(id) for id in value)
+
+
+def check_ids(ids):
+    if not is_ids(ids):
+        raise ValueError("expects a list of ids")
+    return ids
+
+
+def is_command(value):
+    """
+    Check the shape of an ORM command on a x2many field, i.e
+    [0, 0, values], [1, id, values], [2|3|4, id, _], [5, _, _]
+    or [6, _, ids].
+    """
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        return False
+    command, rec_id, arg = value
+    if command == 0:
+        return isinstance(arg, dict)
+    if command == 1:
+        return is_integer(rec_id) and isinstance(arg, dict)
+    if command in [2, 3, 4]:
+        return is_integer(rec_id)
+    if command == 5:
+        return True
+    if command == 6:
+        return is_ids(arg)
+    return False
+
+
+@register_validator('char', 'text', 'html', 'binary')
+def validate_string(value, field):
+    if not is_empty(value) and not isinstance(value, str):
+        raise ValueError("expects a string")
+    return value
+
+
+@register_validator('date')
+def validate_date(value, field):
+    if is_empty(value):
+        return value
+    try:
+        datetime.datetime.strptime(value, DATE_FORMAT)
+    except (TypeError, ValueError):
+        raise ValueError("expects a date formatted as YYYY-MM-DD")
+    return value
+
+
+@register_validator('datetime')
+def validate_datetime(value, field):
+    if is_empty(value):
+        return value
+    # Like Odoo, a date alone means midnight on that date
+    for fmt in [DATETIME_FORMAT, DATE_FORMAT]:
+        try:
+            datetime.datetime.strptime(value, fmt)
+            return value
+        except (TypeError, ValueError):
+            continue
+    raise ValueError("expects a datetime formatted as YYYY-MM-DD HH:MM:SS")
+
+
+@register_validator('selection')
+def validate_selection(value, field):
+    allowed = [key for key, label in field.get('selection') or []]
+    if not is_empty(value) and value not in allowed:
+        raise ValueError("expects one of %s" % allowed)
+    return value
+
+
+@register_validator('integer')
+def validate_integer(value, field):
+    if not is_empty(value) and not is_integer(value):
+        raise ValueError("expects an integer")
+    return value
+
+
+@register_validator('float', 'monetary')
+def validate_float(value, field):
+    if is_empty(value):
+        return value
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise ValueError("expects a number")
+    return value
+
+
+@register_validator('boolean')
+def validate_boolean(value, field):
+    # The ORM also takes 0 and 1 as booleans
+    if value is not None and not isinstance(value, bool) and \
+            value not in [0, 1]:
+        raise ValueError("expects a boolean")
+    return value
+
+
+@register_validator('many2one')
+def validate_many2one(value, field):
+    if not is_empty(value) and not is_integer(value):
+        raise ValueError("expects an id or null")
+    return value
+
+
+@register_validator('one2many', 'many2many')
+def validate_x2many(value, field):
+    if isinstance(value, list) and value and \
+            all(isinstance(item, (list, tuple)) for item in value):
+        # Raw ORM commands e.g [[0, 0, {...}]] to create lines
+        if not all(is_command(item) for item in value):
+            raise ValueError(
+                "expects commands of the form [command, id, value] "
+                "where command is between 0 and 6"
+            )
+        return [tuple(item) for item in value]
+
+    if isinstance(value, list):
+        return [(6, 0, check_ids(value))]  # Replace operation
+
+    if not isinstance(value, dict):
+        raise ValueError(
+            "expects a list of ids, a list of commands or an object "
+            "with %s operations" % "/".join(X2MANY_OPERATIONS)
+        )
+
+    commands = []
+    for operation, ids in value.items():
+        if operation not in X2MANY_OPERATIONS:
+            raise ValueError("has an invalid operation `%s`" % operation)
+        commands.extend(
+            (X2MANY_OPERATIONS[operation], rec_id, 0)
+            for rec_id in check_ids(ids)
+        )
+    return commands
+
+
+def validate_default(value, field):
+    return value
+
+
+class Payload(object):
+    """
+    Validate a write payload(a dict of values or a list of them) against
+    the fields of a model and translate it to what the ORM expects.
+
+    All values are checked before anything is written, errors on all
+    fields are collected and raised together as a `PayloadError`. If
+    `with_id` is true every dict must also have the `id` of the record
+    it applies to, it's kept as is on the translated values.
+    """
+    def __init__(self, all_fields, data, with_id=False):
+        self._all_fields = all_fields
+        self._data = data
+        self._with_id = with_id
+
+    @property
+    def values(self):
+        if isinstance(self._data, list):
+            errors = []
+            values = []
+            for index, item in enumerate(self._data):
+                try:
+                    values.append(self.compile(item))
+                except PayloadError as e:
+                    errors.extend(
+                        ("[%s].%s" % (index, field), message)
+                        for field, message in e.errors
+                    )
+            if errors:
+                raise PayloadError(errors)
+            return values
+        return self.compile(self._data)
+
+    def compile(self, data):
+        if not isinstance(data, dict):
+            raise PayloadError([("data", "expects an object")])
+
+        errors = []
+        values = {}
+        if self._with_id:
+            if is_integer(data.get("id")):
+                values["id"] = data["id"]
+            else:
+                errors.append(("id", "expects an id"))
+
+        for field_name, value in data.items():
+            if self._with_id and field_name == "id":
+                continue
+            if field_name not in self._all_fields:
+                errors.append((field_name, "is not found"))
+                continue
+            field = self._all_fields[field_name]
+            validator = validators.get(field['type'], validate_default)
+            try:
+                values[field_name] = validator(value, field)
+            except ValueError as e:
+                errors.append((field_name, str(e)))
+
+        if errors:
+            raise PayloadError(errors)
+        return values
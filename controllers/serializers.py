@@ -1,11 +1,129 @@
 # -*- coding: utf-8 -*-
-import datetime
-from itertools import chain
-
 from .parser import Parser
 from .exceptions import QueryFormatError
 
 
+# Returned by a converter to drop its field from the serialized data
+OMITTED = object()
+
+# Maps an Odoo field type to the function which converts a whole
+# column of that type, see `register_converter`
+converters = {}
+
+
+def register_converter(*field_types):
+    """
+    Register a column converter for one or more Odoo field types.
+
+    A converter is called as `converter(records, field_name, field, options)`
+    where `records` is the list of records being serialized, `field` is
+    the field description from the model schema and `options` holds the RESTQL
+    query arguments. It must return a list with one converted value per
+    record, or `OMITTED` to drop the field altogether. Addons can use this
+    to serialize their own field types or to override the default ones.
+    """
+    def decorator(converter):
+        for field_type in field_types:
+            converters[field_type] = converter
+        return converter
+    return decorator
+
+
+def get_column(records, field_name):
+    return [rec[field_name] for rec in records]
+
+
+def format_column(values, fmt):
+    return [value.strftime(fmt) if value else value for value in values]
+
+
+@register_converter('one2many', 'many2many')
+def convert_x2many(records, field_name, field, options):
+    return [value.ids for value in get_column(records, field_name)]
+
+
+@register_converter('many2one')
+def convert_many2one(records, field_name, field, options):
+    values = get_column(records, field_name)
+    if options.get("many2one") == "pair":
+        # Same format as the one used by `read` and `name_get`
+        return [
+            [value.id, value.display_name] if value else False
+            for value in values
+        ]
+    return [value.id for value in values]
+
+
+@register_converter('datetime')
+def convert_datetime(records, field_name, field, options):
+    return format_column(get_column(records, field_name), "%Y-%m-%d-%H-%M")
+
+
+@register_converter('date')
+def convert_date(records, field_name, field, options):
+    return format_column(get_column(records, field_name), "%Y-%m-%d")
+
+
+@register_converter('time')
+def convert_time(records, field_name, field, options):
+    return format_column(get_column(records, field_name), "%H-%M-%S")
+
+
+@register_converter('selection')
+def convert_selection(records, field_name, field, options):
+    values = get_column(records, field_name)
+    if options.get("selection") == "label":
+        labels = dict(field.get("selection") or [])
+        return [labels.get(value, value) for value in values]
+    return values
+
+
+@register_converter('monetary')
+def convert_monetary(records, field_name, field, options):
+    return get_column(records, field_name)
+
+
+@register_converter('html')
+def convert_html(records, field_name, field, options):
+    # Html values may be wrapped(e.g by Markup) so make them plain strings
+    return [
+        str(value) if value else value
+        for value in get_column(records, field_name)
+    ]
+
+
+@register_converter('binary')
+def convert_binary(records, field_name, field, options):
+    mode = options.get("binary")
+    if mode == "omit":
+        # Don't even read the field, binary values can be huge
+        return OMITTED
+    if mode == "url":
+        if not records:
+            return []
+        # Read sizes instead of contents to find records with a value
+        sized_records = records[0].browse([rec.id for rec in records if rec])
+        with_value = {
+            rec.id
+            for rec in sized_records.with_context(bin_size=True)
+            if rec[field_name]
+        }
+        return [
+            "/api/%s/%s/%s" % (rec._name, rec.id, field_name)
+            if rec and rec.id in with_value else False
+            for rec in records
+        ]
+    return [
+        value.decode("utf-8") if isinstance(value, bytes) and value
+        else value
+        for value in get_column(records, field_name)
+    ]
+
+
+def convert_default(records, field_name, field, options):
+    return get_column(records, field_name)
+
+
 class Serializer(object):
     def __init__(self, record, query="{*}", many=False):
         self.many = many
@@ -29,123 +147,140 @@ class Serializer(object):
     def data(self):
         parsed_restql_query = self.get_parsed_restql_query()
         if self.many:
-            return [
-                self.serialize(rec, parsed_restql_query)
-                for rec
-                in self._record
-            ]
+            return self.serialize_many(
+                list(self._record),
+                self._record,
+                parsed_restql_query
+            )
         return self.serialize(self._record, parsed_restql_query)
 
     @classmethod
-    def build_flat_field(cls, rec, field_name):
-        all_fields = rec.fields_get()
-        if field_name not in all_fields:
-            msg = "'%s' field is not found" % field_name
-            raise LookupError(msg)
-        field_type = rec.fields_get(field_name).get(field_name).get('type')
-        if field_type in ['one2many', 'many2many']:
-            return {
-                field_name: [record.id for record in rec[field_name]]
-            }
-        elif field_type in ['many2one']:
-            return {field_name: rec[field_name].id}
-        elif field_type == 'datetime' and rec[field_name]:
-            return {
-                field_name: rec[field_name].strftime("%Y-%m-%d-%H-%M")
-            }
-        elif field_type == 'date' and rec[field_name]:
-            return {
-                field_name: rec[field_name].strftime("%Y-%m-%d")
-            }
-        elif field_type == 'time' and rec[field_name]:
-            return {
-                field_name: rec[field_name].strftime("%H-%M-%S")
-            }
-        elif field_type == "binary" and isinstance(rec[field_name], bytes) and rec[field_name]:
-            return {field_name: rec[field_name].decode("utf-8")}
-        else:
-            return {field_name: rec[field_name]}
+    def get_fields(cls, model):
+        # Same cached descriptors as the ones served on `/api/<model>/schema`
+        schema = model.env['rest.api.schema'].get_schema(model._name)[0]
+        return schema["fields"]
 
     @classmethod
-    def build_nested_field(cls, rec, field_name, nested_parsed_query):
-        all_fields = rec.fields_get()
+    def get_field(cls, all_fields, field_name):
         if field_name not in all_fields:
             msg = "'%s' field is not found" % field_name
             raise LookupError(msg)
-        field_type = rec.fields_get(field_name).get(field_name).get('type')
+        return all_fields[field_name]
+
+    @classmethod
+    def build_flat_column(cls, records, field_name, field, options):
+        converter = converters.get(field['type'], convert_default)
+        return converter(records, field_name, field, options)
+
+    @classmethod
+    def build_nested_column(cls, records, model, field_name, field,
+                            nested_parsed_query, options):
+        field_type = field['type']
+        values = get_column(records, field_name)
+        related_model = model.env[field['relation']] \
+            if field_type in ['one2many', 'many2many', 'many2one'] \
+            else None
+
         if field_type in ['one2many', 'many2many']:
-            return {
-                field_name: [
-                    cls.serialize(record, nested_parsed_query)
-                    for record
-                    in rec[field_name]
-                ]
-            }
+            # Serialize all related records at once then split
+            # them back to their parent records
+            related_records = [
+                record
+                for value in values
+                for record in value
+            ]
+            serialized = cls.serialize_many(
+                related_records,
+                related_model,
+                nested_parsed_query,
+                options
+            )
+            column = []
+            start = 0
+            for value in values:
+                stop = start + len(value)
+                column.append(serialized[start:stop])
+                start = stop
+            return column
         elif field_type in ['many2one']:
-            return {
-                field_name: cls.serialize(rec[field_name], nested_parsed_query)
-            }
+            return cls.serialize_many(
+                values,
+                related_model,
+                nested_parsed_query,
+                options
+            )
         else:
-            # Not a neste field
+            # Not a nested field
             msg = "'%s' is not a nested field" % field_name
             raise ValueError(msg)
 
     @classmethod
     def serialize(cls, rec, parsed_query):
-        data = {}
-
-        # NOTE: self.parsed_restql_query["include"] not being empty
-        # is not a guarantee that the exclude operator(-) has not been
-        # used because the same self.parsed_restql_query["include"]
-        # is used to store nested fields when the exclude operator(-) is used
-        if parsed_query["exclude"]:
-            # Exclude fields from a query
-            all_fields = rec.fields_get()
-            for field in parsed_query["include"]:
-                if field == "*":
-                    continue
-                for nested_field, nested_parsed_query in field.items():
-                    built_nested_field = cls.build_nested_field(
-                        rec,
-                        nested_field,
-                        nested_parsed_query
-                    )
-                    data.update(built_nested_field)
-
-            flat_fields= set(all_fields).symmetric_difference(set(parsed_query['exclude']))
-            for field in flat_fields:
-                flat_field = cls.build_flat_field(rec, field)
-                data.update(flat_field)
-
-        elif parsed_query["include"]:
-            # Here we are sure that self.parsed_restql_query["exclude"]
-            # is empty which means the exclude operator(-) is not used,
-            # so self.parsed_restql_query["include"] contains only fields
-            # to include
-            all_fields = rec.fields_get()
-            if "*" in parsed_query['include']:
-                # Include all fields
-                parsed_query['include'] = filter(
-                    lambda item: item != "*",
-                    parsed_query['include']
-                )
-                fields = chain(parsed_query['include'], all_fields)
-                parsed_query['include'] = list(fields)
-
-            for field in parsed_query["include"]:
-                if isinstance(field, dict):
-                    for nested_field, nested_parsed_query in field.items():
-                        built_nested_field = cls.build_nested_field(
-                            rec,
-                            nested_field,
-                            nested_parsed_query
-                        )
-                        data.update(built_nested_field)
-                else:
-                    flat_field = cls.build_flat_field(rec, field)
-                    data.update(flat_field)
-        else:
+        return cls.serialize_many([rec], rec, parsed_query)[0]
+
+    @classmethod
+    def serialize_many(cls, records, model, parsed_query, options=None):
+        """
+        Serialize `records`(a list of records of `model`) column by column,
+        each field is read and converted for all records at once.
+        """
+        # Query arguments are inherited by nested queries
+        options = dict(options or {}, **parsed_query["arguments"])
+
+        if not parsed_query["include"] and not parsed_query["exclude"]:
             # The query is empty i.e query={}
             # return nothing
-            return {}
-        return data
\ No newline at end of file
+            return [{} for rec in records]
+
+        all_fields = cls.get_fields(model)
+
+        # NOTE: parsed_query["include"] not being empty is not a guarantee
+        # that the exclude operator(-) has not been used because the same
+        # parsed_query["include"] is used to store nested fields(and `*`)
+        # when the exclude operator(-) is used
+        for field_name in parsed_query["exclude"]:
+            cls.get_field(all_fields, field_name)
+        excluded_fields = set(parsed_query["exclude"])
+
+        nested_fields = {}
+        field_names = []
+        for field in parsed_query["include"]:
+            if isinstance(field, dict):
+                nested_fields.update(field)
+                names = list(field)
+            elif field == "*":
+                # Include all fields
+                names = list(all_fields)
+            else:
+                names = [field]
+            for field_name in names:
+                if field_name in excluded_fields or field_name in field_names:
+                    continue
+                field_names.append(field_name)
+
+        columns = []
+        for field_name in field_names:
+            field = cls.get_field(all_fields, field_name)
+            if field_name in nested_fields:
+                column = cls.build_nested_column(
+                    records,
+                    model,
+                    field_name,
+                    field,
+                    nested_fields[field_name],
+                    options
+                )
+            else:
+                column = cls.build_flat_column(
+                    records,
+                    field_name,
+                    field,
+                    options
+                )
+            if column is not OMITTED:
+                columns.append((field_name, column))
+
+        return [
+            {field_name: column[i] for field_name, column in columns}
+            for i in range(len(records))
+        ]
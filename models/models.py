@@ -1,3 +1,41 @@
 # -*- coding: utf-8 -*-
+import json
+import hashlib
 
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
+
+
+class RestApiSchema(models.AbstractModel):
+    _name = 'rest.api.schema'
+    _description = 'REST API Model Schema'
+
+    # Field attributes exposed on a model schema
+    FIELD_ATTRIBUTES = [
+        'type', 'string', 'help', 'relation', 'selection', 'store',
+        'required', 'readonly', 'sortable', 'searchable',
+    ]
+
+    @api.model
+    @tools.ormcache('self.env.uid', 'self.env.lang', 'model_name')
+    def get_schema(self, model_name):
+        """
+        Return the descriptor of `model_name` and its ETag.
+
+        The result is computed once per user(fields depend on the groups
+        of the user) and language(labels are translated), it's kept in
+        the registry cache which is cleared whenever modules are
+        installed or upgraded. Callers must not modify it.
+        """
+        model = self.env[model_name]
+        all_fields = model.fields_get(attributes=self.FIELD_ATTRIBUTES)
+        for field_name, field in all_fields.items():
+            field['computed'] = bool(model._fields[field_name].compute)
+
+        schema = {
+            "model": model_name,
+            "name": model._description,
+            "fields": all_fields
+        }
+        content = json.dumps(schema, sort_keys=True)
+        etag = '"%s"' % hashlib.sha1(content.encode("utf-8")).hexdigest()
+        return schema, etag
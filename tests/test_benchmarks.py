@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Integration benchmarks for the REST API, they're excluded from the
+standard test run. Run them with
+
+    odoo-bin -d <db> -i <this module> --test-enable \
+        --test-tags rest_api_benchmark --stop-after-init
+
+`REST_API_BENCHMARK_SIZES`(default `1000`) holds comma separated numbers
+of records to generate e.g `1000,100000,1000000` and the JSON report is
+written to `REST_API_BENCHMARK_OUTPUT` if it's set or logged otherwise.
+"""
+import os
+import json
+import logging
+
+from odoo.tests import common, tagged
+
+from ..benchmarks.common import measure, build_report, write_report
+
+
+_logger = logging.getLogger(__name__)
+
+# Used to mark generated records so that they can be filtered
+BENCHMARK_REF = "rest_api_benchmark"
+
+
+@tagged('-standard', 'rest_api_benchmark')
+class TestAPIBenchmarks(common.HttpCase):
+    rounds = 3
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('admin', 'admin')
+
+    def generate_partners(self, size):
+        """
+        Insert `size` partners with plain SQL, creating millions of
+        records through the ORM would take far too long. Every partner
+        has a parent so that nested queries have something to follow.
+        """
+        parent = self.env['res.partner'].create({
+            'name': 'Bench Company',
+            'is_company': True
+        })
+        self.env.cr.execute("""
+            INSERT INTO res_partner
+                (name, display_name, ref, active, type, is_company,
+                 parent_id)
+            SELECT 'Bench ' || n, 'Bench ' || n, %s, true, 'contact', false,
+                %s
+            FROM generate_series(1, %s) AS n
+        """, (BENCHMARK_REF, parent.id, size))
+        self.env['res.partner'].invalidate_cache()
+
+    def api_request(self, method, url, params=None, json_params=None):
+        url = "http://%s:%s%s" % (common.HOST, common.PORT, url)
+        if json_params is not None:
+            response = self.opener.request(
+                method,
+                url,
+                data=json.dumps({"params": json_params}),
+                headers={'Content-Type': 'application/json'},
+                timeout=3600
+            )
+        else:
+            response = self.opener.request(
+                method,
+                url,
+                params=params,
+                timeout=3600
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("error", response.json())
+        return response
+
+    def bulk_request(self, method, url, size, params=None, json_params=None):
+        """
+        Make a chunked bulk request and make sure it processed all
+        `size` records, a failed chunk doesn't make an error response.
+        """
+        res = self.api_request(method, url, params, json_params).json()
+        if json_params is not None:
+            res = res["result"]
+        self.assertTrue(res["result"], res.get("error"))
+        self.assertEqual(res["count"], size)
+        return res
+
+    def run_benchmarks(self, size):
+        filters = json.dumps([["ref", "=", BENCHMARK_REF]])
+        results = []
+
+        def bench(name, func, rounds=self.rounds):
+            results.append(measure(
+                "%s.%s" % (name, size), func, rounds=rounds, size=size))
+
+        bench("list", lambda: self.api_request(
+            "GET", "/api/res.partner/",
+            params={"query": "{id, name}", "filter": filters}))
+        bench("nested", lambda: self.api_request(
+            "GET", "/api/res.partner/",
+            params={
+                "query": "{id, name, parent_id{id, name}}",
+                "filter": filters,
+                "limit": 1000
+            }))
+        bench("paging", lambda: self.api_request(
+            "GET", "/api/res.partner/",
+            params={
+                "query": "{id, name}",
+                "filter": filters,
+                "page_size": 100,
+                "page": max(size // 100, 1)
+            }))
+        bench("bulk_write", lambda: self.bulk_request(
+            "PUT", "/api/res.partner/", size,
+            json_params={
+                "filter": [["ref", "=", BENCHMARK_REF]],
+                "data": {"comment": "benchmark"},
+                "chunk_size": 1000
+            }))
+        # Deleting destroys the dataset so it can only run once
+        bench("bulk_delete", lambda: self.bulk_request(
+            "DELETE", "/api/res.partner/", size,
+            params={"filter": filters, "chunk_size": 1000}), rounds=1)
+        return results
+
+    def test_benchmarks(self):
+        sizes = os.environ.get("REST_API_BENCHMARK_SIZES", "1000")
+        results = []
+        for size in [int(size) for size in sizes.split(",")]:
+            self.generate_partners(size)
+            results.extend(self.run_benchmarks(size))
+
+        report = build_report("integration", results)
+        output = os.environ.get("REST_API_BENCHMARK_OUTPUT")
+        if output:
+            write_report(report, output)
+        else:
+            _logger.info(json.dumps(report, indent=4))
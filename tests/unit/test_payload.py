@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of write payload validation, they run without Odoo. Run them from
+the module's root directory with
+
+    python -m unittest discover -s tests/unit
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from benchmarks.micro import load_controllers  # noqa: E402
+
+
+modules = load_controllers(["exceptions", "payload"])
+Payload = modules["payload"].Payload
+PayloadError = modules["exceptions"].PayloadError
+
+
+FIELDS = {
+    "name": {"type": "char"},
+    "qty": {"type": "integer"},
+    "price": {"type": "float"},
+    "active": {"type": "boolean"},
+    "date": {"type": "date"},
+    "write_date": {"type": "datetime"},
+    "state": {
+        "type": "selection",
+        "selection": [("draft", "Draft"), ("done", "Done")]
+    },
+    "partner_id": {"type": "many2one", "relation": "res.partner"},
+    "tag_ids": {"type": "many2many", "relation": "res.partner.category"},
+}
+
+
+def get_errors(data, **kwargs):
+    try:
+        Payload(FIELDS, data, **kwargs).values
+    except PayloadError as e:
+        return e.errors
+    raise AssertionError("%s is expected to be invalid" % data)
+
+
+class TestValidators(unittest.TestCase):
+    def test_valid_values(self):
+        data = {
+            "name": "Pen",
+            "qty": 3,
+            "price": 1.5,
+            "active": True,
+            "date": "2020-01-31",
+            "write_date": "2020-01-31 10:30:00",
+            "state": "done",
+            "partner_id": 7,
+        }
+        self.assertEqual(Payload(FIELDS, data).values, data)
+
+    def test_empty_values(self):
+        for value in [None, False]:
+            data = {
+                field_name: value
+                for field_name in FIELDS
+                if field_name != "tag_ids"
+            }
+            self.assertEqual(Payload(FIELDS, data).values, data)
+
+    def test_boolean_accepts_0_and_1(self):
+        data = {"active": 0}
+        self.assertEqual(Payload(FIELDS, data).values, data)
+        self.assertEqual(get_errors({"active": 2}), [
+            ("active", "expects a boolean")
+        ])
+
+    def test_invalid_values(self):
+        self.assertEqual(get_errors({"name": 1}), [
+            ("name", "expects a string")
+        ])
+        self.assertEqual(get_errors({"qty": "1"}), [
+            ("qty", "expects an integer")
+        ])
+        self.assertEqual(get_errors({"qty": True}), [
+            ("qty", "expects an integer")
+        ])
+        self.assertEqual(get_errors({"price": "1.5"}), [
+            ("price", "expects a number")
+        ])
+        self.assertEqual(get_errors({"partner_id": "7"}), [
+            ("partner_id", "expects an id or null")
+        ])
+        self.assertEqual(get_errors({"state": "cancel"}), [
+            ("state", "expects one of ['draft', 'done']")
+        ])
+
+    def test_dates(self):
+        self.assertEqual(
+            Payload(FIELDS, {"write_date": "2020-01-31"}).values,
+            {"write_date": "2020-01-31"}
+        )
+        self.assertEqual(get_errors({"date": "not-a-date"}), [
+            ("date", "expects a date formatted as YYYY-MM-DD")
+        ])
+        self.assertEqual(get_errors({"date": "2020-02-30"}), [
+            ("date", "expects a date formatted as YYYY-MM-DD")
+        ])
+        self.assertEqual(get_errors({"write_date": "2020-01-31T10"}), [
+            ("write_date",
+             "expects a datetime formatted as YYYY-MM-DD HH:MM:SS")
+        ])
+
+    def test_unknown_field(self):
+        self.assertEqual(get_errors({"colour": "red"}), [
+            ("colour", "is not found")
+        ])
+
+    def test_data_is_not_an_object(self):
+        self.assertEqual(get_errors("name"), [("data", "expects an object")])
+
+
+class TestX2many(unittest.TestCase):
+    def get_commands(self, value):
+        return Payload(FIELDS, {"tag_ids": value}).values["tag_ids"]
+
+    def test_replace(self):
+        self.assertEqual(self.get_commands([1, 2]), [(6, 0, [1, 2])])
+        self.assertEqual(self.get_commands([]), [(6, 0, [])])
+
+    def test_operations(self):
+        commands = self.get_commands({
+            "push": [1, 2],
+            "pop": [3],
+            "delete": [4]
+        })
+        self.assertEqual(
+            commands,
+            [(4, 1, 0), (4, 2, 0), (3, 3, 0), (2, 4, 0)]
+        )
+
+    def test_invalid_operation(self):
+        self.assertEqual(get_errors({"tag_ids": {"move": [1]}}), [
+            ("tag_ids", "has an invalid operation `move`")
+        ])
+        self.assertEqual(get_errors({"tag_ids": {"push": ["1"]}}), [
+            ("tag_ids", "expects a list of ids")
+        ])
+
+    def test_commands(self):
+        commands = [
+            [0, 0, {"name": "New"}],
+            [1, 5, {"name": "Renamed"}],
+            [2, 6, 0],
+            [3, 7, 0],
+            [4, 8, 0],
+            [5, 0, 0],
+            [6, 0, [1, 2]],
+        ]
+        self.assertEqual(
+            self.get_commands(commands),
+            [tuple(command) for command in commands]
+        )
+
+    def test_invalid_commands(self):
+        for command in [
+                [0, 0, "junk"],
+                [1, "5", {}],
+                [4, "8", 0],
+                [6, 0, "abc"],
+                [6, 0, [1, "a"]],
+                [7, 0, 0],
+                [4, 8]]:
+            errors = get_errors({"tag_ids": [command]})
+            self.assertEqual(len(errors), 1, command)
+            self.assertEqual(errors[0][0], "tag_ids")
+
+    def test_mixed_ids_and_commands(self):
+        self.assertEqual(get_errors({"tag_ids": [1, [4, 1, 0]]}), [
+            ("tag_ids", "expects a list of ids")
+        ])
+
+
+class TestListPayload(unittest.TestCase):
+    def test_values(self):
+        data = [{"name": "Pen"}, {"name": "Pencil", "tag_ids": [1]}]
+        self.assertEqual(Payload(FIELDS, data).values, [
+            {"name": "Pen"},
+            {"name": "Pencil", "tag_ids": [(6, 0, [1])]}
+        ])
+
+    def test_with_id(self):
+        data = [{"id": 1, "name": "Pen"}, {"id": 2, "qty": 3}]
+        self.assertEqual(Payload(FIELDS, data, with_id=True).values, data)
+
+    def test_missing_id(self):
+        self.assertEqual(get_errors([{"name": "Pen"}], with_id=True), [
+            ("[0].id", "expects an id")
+        ])
+        self.assertEqual(get_errors([{"id": "1"}], with_id=True), [
+            ("[0].id", "expects an id")
+        ])
+
+    def test_errors_are_aggregated(self):
+        data = [
+            {"name": "Pen"},
+            {"name": 1, "qty": "x"},
+            {"colour": "red"},
+        ]
+        self.assertEqual(get_errors(data), [
+            ("[1].name", "expects a string"),
+            ("[1].qty", "expects an integer"),
+            ("[2].colour", "is not found"),
+        ])
+
+    def test_error_message_and_details(self):
+        try:
+            Payload(FIELDS, {"name": 1, "colour": "red"}).values
+        except PayloadError as e:
+            self.assertEqual(
+                e.msg,
+                "Invalid payload: `name` expects a string, "
+                "`colour` is not found"
+            )
+            self.assertEqual(e.details, [
+                {"field": "name", "message": "expects a string"},
+                {"field": "colour", "message": "is not found"},
+            ])
+        else:
+            self.fail("PayloadError is not raised")
+
+
+if __name__ == "__main__":
+    unittest.main()